@@ -0,0 +1,112 @@
+"""
+Benchmark de memória: bytes por motorista no formato antigo (dict + cópia
+no histórico) e no formato compacto (Motorista/RegistroStatus com __slots__).
+
+Uso:
+    python benchmark_memoria.py [quantidade]
+"""
+
+import json
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+from estrutura import Motorista, RegistroStatus, RoboBolsao
+
+STATUS = ['concluido', 'cancelado']
+# Placeholders que aparecem repetidos na base real (ex.: "GILBERT", "RODRIGU")
+PLACAS_REPETIDAS = ['GILBERT', 'RODRIGU', 'RISSARD']
+
+
+def _nova(texto):
+    """Cópia nova da string (como o json.load faz para cada registro)."""
+    return texto.encode().decode()
+
+
+def gerar_entradas(quantidade):
+    """Gera strings novas a cada execução, como se viessem do JSON/chat."""
+    data = datetime.now().strftime('%d/%m/%Y %H:%M')
+    for i in range(quantidade):
+        lh = f'LT0PC301{i:05X}'
+        if i % 4 == 0:
+            placas = _nova(PLACAS_REPETIDAS[i % 3])
+        else:
+            placas = f'ABC{i % 10}{i % 7}{i % 5}{i % 3},MLF{i % 9}D{i % 8}0'
+        nome = f'Motorista Numero {i}'
+        # Metade dos motoristas já tem entrada no histórico
+        status = _nova(STATUS[(i // 2) % 2]) if i % 2 == 0 else None
+        yield lh, placas, nome, status, _nova(data)
+
+
+def carregar_dicts(quantidade):
+    motoristas, historico = {}, {}
+    for lh, placas, nome, status, data in gerar_entradas(quantidade):
+        motorista = {'LH': lh, 'Placas': placas, 'Nome': nome}
+        motoristas[lh] = motorista
+        if status:
+            # Formato antigo: histórico guarda uma cópia do motorista
+            historico[lh] = {
+                'motorista': dict(motorista),
+                'status': status,
+                'data': data,
+                'motivo': status
+            }
+    return motoristas, historico
+
+
+def carregar_compacto(quantidade):
+    motoristas, historico = {}, {}
+    for lh, placas, nome, status, data in gerar_entradas(quantidade):
+        motorista = Motorista(lh, placas, nome)
+        motoristas[lh] = motorista
+        if status:
+            historico[lh] = RegistroStatus(motorista, status, data, status)
+    return motoristas, historico
+
+
+def escrever_arquivo(quantidade, caminho):
+    """Grava um motoristas.json com uma alteração registrada por LH."""
+    motoristas, historico = carregar_dicts(quantidade)
+    alteracoes = {lh: i + 1 for i, lh in enumerate(motoristas)}
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({
+            'motoristas': motoristas,
+            'historico': historico,
+            'versao': len(alteracoes),
+            'alteracoes': alteracoes
+        }, f)
+
+
+def medir_robo(quantidade):
+    """Memória retida por um RoboBolsao carregado do arquivo (inclui `alteracoes`)."""
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = f'{pasta}/motoristas.json'
+        escrever_arquivo(quantidade, caminho)
+        tracemalloc.start()
+        robo = RoboBolsao(caminho)
+        atual, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del robo
+    return atual / quantidade
+
+
+def medir(carregar, quantidade):
+    tracemalloc.start()
+    dados = carregar(quantidade)
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del dados
+    return atual / quantidade
+
+
+if __name__ == '__main__':
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    antes = medir(carregar_dicts, quantidade)
+    depois = medir(carregar_compacto, quantidade)
+    robo = medir_robo(quantidade)
+    print(f'Motoristas: {quantidade}')
+    print(f'dict + cópia no histórico: {antes:.1f} bytes/motorista')
+    print(f'Motorista com __slots__:   {depois:.1f} bytes/motorista')
+    print(f'Economia: {100 * (1 - depois / antes):.1f}%')
+    print(f'RoboBolsao carregado:      {robo:.1f} bytes/motorista')
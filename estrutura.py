@@ -2,19 +2,140 @@
 Criar uma classe estruturada para organizar meu codigo
 (Copiado de projeto_trabalho/estrutura.py para uso no app_cell)
 """
+import sys
 import time
 import json
+import uuid
 from datetime import datetime
 from pathlib import Path
 
 data = time.localtime()
 data_atual =  f'{data.tm_mday}/{data.tm_mon}/{data.tm_year} {data.tm_hour}:{data.tm_min}'
 
+# Máximo de LHs em `alteracoes`; acima disso as mais antigas são descartadas
+LIMITE_ALTERACOES = 10000
+
+def _internar(valor):
+    """Interna strings; outros valores (ex.: null no JSON) passam como estão."""
+    return sys.intern(valor) if isinstance(valor, str) else valor
+
+
+class _RegistroCompacto:
+    """Base para registros com __slots__ que se comportam como dict somente leitura.
+
+    Os campos conhecidos ficam em CAMPOS; outras chaves vindas do JSON ficam
+    em `extras` (None quando não há) e são gravadas de volta sem perda.
+    Comparam por valor e são mutáveis, por isso não são hasheáveis.
+    """
+    __slots__ = ()
+    CAMPOS = ()
+    __hash__ = None
+
+    @classmethod
+    def _separar_extras(cls, dados):
+        return {chave: valor for chave, valor in dados.items() if chave not in cls.CAMPOS} or None
+
+    def __getitem__(self, chave):
+        if chave in self.CAMPOS:
+            return getattr(self, chave)
+        if self.extras is None:
+            raise KeyError(chave)
+        return self.extras[chave]
+
+    def __contains__(self, chave):
+        return chave in self.CAMPOS or (self.extras is not None and chave in self.extras)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.CAMPOS) + len(self.extras or ())
+
+    def get(self, chave, padrao=None):
+        try:
+            return self[chave]
+        except KeyError:
+            return padrao
+
+    def keys(self):
+        return list(self.CAMPOS) + list(self.extras or ())
+
+    def items(self):
+        return [(chave, self[chave]) for chave in self.keys()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, outro):
+        if not isinstance(outro, type(self)):
+            return NotImplemented
+        return self.items() == outro.items()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+
+class Motorista(_RegistroCompacto):
+    """Motorista com campos fixos; placas internadas (muitas se repetem)."""
+    CAMPOS = ('LH', 'Placas', 'Nome')
+    __slots__ = CAMPOS + ('extras',)
+
+    def __init__(self, LH, Placas, Nome, extras=None):
+        self.LH = LH
+        self.Placas = _internar(Placas)
+        self.Nome = Nome
+        self.extras = extras
+
+    @classmethod
+    def from_dict(cls, dados):
+        return cls(
+            dados.get('LH', ''), dados.get('Placas', ''), dados.get('Nome', ''),
+            cls._separar_extras(dados)
+        )
+
+
+class RegistroStatus(_RegistroCompacto):
+    """Entrada do histórico; referencia o Motorista em vez de copiá-lo."""
+    CAMPOS = ('motorista', 'status', 'data', 'motivo')
+    __slots__ = CAMPOS + ('extras',)
+
+    def __init__(self, motorista, status, data, motivo, extras=None):
+        self.motorista = motorista
+        self.status = _internar(status)
+        self.data = _internar(data)
+        self.motivo = _internar(motivo)
+        self.extras = extras
+
+    @classmethod
+    def from_dict(cls, dados, motorista=None):
+        """Cria a entrada; reaproveita `motorista` só se for igual ao registro salvo."""
+        salvo = dados.get('motorista')
+        if not isinstance(salvo, dict):
+            salvo = {}
+        if motorista is None or motorista.to_dict() != salvo:
+            motorista = Motorista.from_dict(salvo)
+        return cls(
+            motorista, dados.get('status', ''), dados.get('data', ''), dados.get('motivo', ''),
+            cls._separar_extras(dados)
+        )
+
+    def to_dict(self):
+        dados = super().to_dict()
+        dados['motorista'] = self.motorista.to_dict()
+        return dados
+
+
 class RoboBolsao:
     def __init__(self, arquivo_dados='motoristas.json'):
         self.arquivo_dados = arquivo_dados
         self.dados_motoristas = {}
         self.historico_status = {}  # Rastreia status: 'ativo', 'concluido', 'cancelado'
+        self.versao = 0  # Incrementa a cada alteração nos dados
+        self.alteracoes = {}  # LH -> versão da última alteração (inclui removidos)
+        # Alterações até esta versão já foram descartadas de `alteracoes`
+        self.versao_minima = 0
+        # Identifica esta base; muda quando o arquivo é recriado e a versão recomeça
+        self.epoca = uuid.uuid4().hex[:12]
         # Carregar dados persistidos
         self._carregar_dados()
     
@@ -24,28 +145,137 @@ class RoboBolsao:
             try:
                 with open(self.arquivo_dados, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    self.dados_motoristas = data.get('motoristas', {})
-                    self.historico_status = data.get('historico', {})
+                    # Entradas que não são dict ficam como estão (pesquisa já as ignora)
+                    self.dados_motoristas = {
+                        lh: self._motorista_do_arquivo(lh, m) if isinstance(m, dict) else m
+                        for lh, m in data.get('motoristas', {}).items()
+                    }
+                    # Histórico reaproveita o objeto do motorista ativo quando é o mesmo registro
+                    self.historico_status = {
+                        lh: RegistroStatus.from_dict(h, self._motorista_ativo(lh)) if isinstance(h, dict) else h
+                        for lh, h in data.get('historico', {}).items()
+                    }
+                    self.versao = data.get('versao', 0)
+                    self.alteracoes = data.get('alteracoes', {})
+                    self.versao_minima = data.get('versao_minima', 0)
+                    self.epoca = data.get('epoca') or uuid.uuid4().hex[:12]
+                    self._compactar_alteracoes()
             except Exception as e:
                 print(f"Aviso ao carregar dados: {e}")
                 self.dados_motoristas = {}
                 self.historico_status = {}
+                self.versao = 0
+                self.alteracoes = {}
+                self.versao_minima = 0
+                self.epoca = uuid.uuid4().hex[:12]
     
+    @staticmethod
+    def _motorista_do_arquivo(lh, dados):
+        motorista = Motorista.from_dict(dados)
+        # Usa a mesma string da chave do dict (o json cria outra para o valor)
+        if motorista.LH == lh:
+            motorista.LH = lh
+        return motorista
+
+    def _motorista_ativo(self, lh):
+        motorista = self.dados_motoristas.get(lh)
+        return motorista if isinstance(motorista, Motorista) else None
+
     def _salvar_dados(self):
         """Persiste dados em arquivo JSON."""
         try:
             data = {
                 'motoristas': self.dados_motoristas,
-                'historico': self.historico_status
+                'historico': self.historico_status,
+                'versao': self.versao,
+                'alteracoes': self.alteracoes,
+                'versao_minima': self.versao_minima,
+                'epoca': self.epoca
             }
             with open(self.arquivo_dados, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                # Registros compactos viram dict um de cada vez durante a escrita
+                json.dump(data, f, indent=2, ensure_ascii=False, default=lambda o: o.to_dict())
         except Exception as e:
             print(f"Erro ao salvar dados: {e}")
 
+    def _registrar_alteracao(self, *lhs):
+        """Avança a versão dos dados e marca os LHs alterados."""
+        self.versao += 1
+        for lh in lhs:
+            self.alteracoes[lh] = self.versao
+        self._compactar_alteracoes()
+
+    def _compactar_alteracoes(self):
+        """Acima de LIMITE_ALTERACOES, descarta as alterações mais antigas.
+        
+        Sobe versao_minima até sobrar cerca de metade do limite; tokens mais
+        antigos que ela passam a receber a lista completa.
+        """
+        if len(self.alteracoes) <= LIMITE_ALTERACOES:
+            return
+        versoes = sorted(self.alteracoes.values())
+        self.versao_minima = versoes[len(versoes) - LIMITE_ALTERACOES // 2 - 1]
+        # Dict novo: apagar chaves não devolve a memória da tabela
+        self.alteracoes = {lh: v for lh, v in self.alteracoes.items() if v > self.versao_minima}
+
+    def token_versao(self):
+        """Versão atual para sincronização, no formato '<epoca>.<versao>'."""
+        return f'{self.epoca}.{self.versao}'
+
+    def versao_do_token(self, token):
+        """Versão do token se ele for desta base e ainda válido; senão None."""
+        epoca, _, versao = (token or '').rpartition('.')
+        if epoca != self.epoca or not versao.isdigit():
+            return None
+        versao = int(versao)
+        if versao <= 0 or versao < self.versao_minima or versao > self.versao:
+            return None
+        return versao
+
     def listar_motoristas(self):
         """Retorna lista de motoristas ativos."""
         return list(self.dados_motoristas.values())
+
+    def exportar_motoristas(self, desde=None):
+        """Retorna motoristas como registros estruturados para sincronização.
+        
+        Args:
+            desde: token de versão (token_versao()) já conhecido pelo cliente;
+                   se for desta base, retorna só o que mudou depois dele
+                   (incluindo LHs removidos). Senão retorna tudo.
+        
+        Retorna:
+            dict: {'versao': str, 'completo': bool, 'motoristas': list, 'removidos': list}
+        """
+        desde = self.versao_do_token(desde)
+        completo = desde is None
+        if completo:
+            lhs = list(self.dados_motoristas)
+            removidos = []
+        else:
+            alterados = [lh for lh, v in self.alteracoes.items() if v > desde]
+            lhs = [lh for lh in alterados if lh in self.dados_motoristas]
+            removidos = [lh for lh in alterados if lh not in self.dados_motoristas]
+
+        motoristas = []
+        for lh in lhs:
+            motorista = self.dados_motoristas[lh]
+            # Entradas que não são Motorista (ver _carregar_dados) ficam de fora
+            if not isinstance(motorista, Motorista):
+                continue
+            motoristas.append({
+                'LH': motorista.get('LH', lh),
+                'Nome': motorista.get('Nome', ''),
+                'Placas': motorista.get('Placas', ''),
+                'status': self.obter_status_motorista(lh),
+                'versao': self.alteracoes.get(lh, 0)
+            })
+        return {
+            'versao': self.token_versao(),
+            'completo': completo,
+            'motoristas': motoristas,
+            'removidos': removidos
+        }
     
     def adicionar_varios_motoristas(self, lista_dados):
         lines = lista_dados.strip().split("\n")
@@ -65,16 +295,14 @@ class RoboBolsao:
             dict: {'status': 'novo'|'duplicado'|'erro', 'mensagem': str, 'dados': dict|None}
         """
         try:
-            dados_tratados = {}
             dados_separados = dado.split()
-            dados_tratados['LH'] = dados_separados[0]
+            lh = dados_separados[0]
             dados_separados.pop(0)
-            dados_tratados['Placas'] = dados_separados[-1]
+            placas = dados_separados[-1]
             dados_separados.pop(-1)
             nome = ' '.join(dados_separados)
-            dados_tratados['Nome'] = nome
+            dados_tratados = Motorista(lh, placas, nome)
             
-            lh = dados_tratados['LH']
             if lh in self.dados_motoristas:
                 return {
                     'status': 'duplicado',
@@ -82,6 +310,7 @@ class RoboBolsao:
                     'dados': self.dados_motoristas[lh]
                 }
             self.dados_motoristas[lh] = dados_tratados
+            self._registrar_alteracao(lh)
             self._salvar_dados()
             return {
                 'status': 'novo',
@@ -117,7 +346,7 @@ class RoboBolsao:
 
         if q_caracter == 7:
             for chave, motorista_dict in self.dados_motoristas.items():
-                if isinstance(motorista_dict, dict):
+                if isinstance(motorista_dict, Motorista):
                     placa = motorista_dict.get('Placas', '').lower()
 
                     if len(placa) > 7:
@@ -132,7 +361,7 @@ class RoboBolsao:
 
         elif q_caracter == 13:
             for chave, motorista_dict in self.dados_motoristas.items():
-                if isinstance(motorista_dict, dict):
+                if isinstance(motorista_dict, Motorista):
                     lh = motorista_dict.get('LH', '').lower()
                     if lh == p_user:
                         resultado.append(motorista_dict)
@@ -146,12 +375,13 @@ class RoboBolsao:
         try:
             if dado_remover in self.dados_motoristas:
                 motorista = self.dados_motoristas.pop(dado_remover)
-                self.historico_status[dado_remover] = {
-                    'motorista': motorista,
-                    'status': 'cancelado',
-                    'data': datetime.now().strftime('%d/%m/%Y %H:%M'),
-                    'motivo': 'removido'
-                }
+                self.historico_status[dado_remover] = RegistroStatus(
+                    motorista,
+                    'cancelado',
+                    datetime.now().strftime('%d/%m/%Y %H:%M'),
+                    'removido'
+                )
+                self._registrar_alteracao(dado_remover)
                 self._salvar_dados()
                 return {'status': 'sucesso', 'mensagem': f'Motorista {motorista["Nome"]} removido com sucesso.'}
             else:
@@ -165,12 +395,13 @@ class RoboBolsao:
             return {'status': 'erro', 'mensagem': 'Motorista não encontrado.'}
         
         motorista = self.dados_motoristas[lh]
-        self.historico_status[lh] = {
-            'motorista': motorista,
-            'status': 'concluido',
-            'data': datetime.now().strftime('%d/%m/%Y %H:%M'),
-            'motivo': 'concluído'
-        }
+        self.historico_status[lh] = RegistroStatus(
+            motorista,
+            'concluido',
+            datetime.now().strftime('%d/%m/%Y %H:%M'),
+            'concluído'
+        )
+        self._registrar_alteracao(lh)
         self._salvar_dados()
         return {
             'status': 'sucesso',
@@ -184,12 +415,13 @@ class RoboBolsao:
             return {'status': 'erro', 'mensagem': 'Motorista não encontrado.'}
         
         motorista = self.dados_motoristas[lh]
-        self.historico_status[lh] = {
-            'motorista': motorista,
-            'status': 'cancelado',
-            'data': datetime.now().strftime('%d/%m/%Y %H:%M'),
-            'motivo': 'cancelado'
-        }
+        self.historico_status[lh] = RegistroStatus(
+            motorista,
+            'cancelado',
+            datetime.now().strftime('%d/%m/%Y %H:%M'),
+            'cancelado'
+        )
+        self._registrar_alteracao(lh)
         self._salvar_dados()
         return {
             'status': 'sucesso',
@@ -231,6 +463,8 @@ class RoboBolsao:
     def limpar_todos_motoristas(self):
         try:
             qtd_antes = len(self.dados_motoristas)
+            if qtd_antes:
+                self._registrar_alteracao(*self.dados_motoristas)
             self.dados_motoristas.clear()
             self._salvar_dados()
             return {
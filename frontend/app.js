@@ -6,6 +6,8 @@ const CONFIG = {
 
 let websocket = null;
 let isConnected = false;
+let ultimaSeq = 0; // Última mensagem numerada recebida (para reenvio ao reconectar)
+let jaConectou = false;
 let deferredPrompt = null;
 
 // Inicialização
@@ -21,7 +23,11 @@ window.addEventListener('load', () => {
 // ==========================================
 
 function conectarWebSocket() {
-    const wsUrl = `${CONFIG.WS_URL}/${CONFIG.USER_ID}`;
+    let wsUrl = `${CONFIG.WS_URL}/${CONFIG.USER_ID}`;
+    if (jaConectou) {
+        // Reconexão: pede ao servidor só o que foi perdido
+        wsUrl += `?last_seq=${ultimaSeq}`;
+    }
     console.log('🔌 Conectando ao WebSocket:', wsUrl);
     
     websocket = new WebSocket(wsUrl);
@@ -29,6 +35,7 @@ function conectarWebSocket() {
     websocket.onopen = () => {
         console.log('✅ WebSocket conectado');
         isConnected = true;
+        jaConectou = true;
         atualizarStatus(true);
         mostrarToast('Conectado ao servidor');
     };
@@ -37,6 +44,12 @@ function conectarWebSocket() {
         const data = JSON.parse(event.data);
         console.log('📨 Mensagem recebida:', data);
         
+        if (data.seq !== undefined) {
+            // Ignora mensagens repetidas
+            if (data.seq <= ultimaSeq) return;
+            ultimaSeq = data.seq;
+        }
+        
         if (data.tipo === 'sistema') {
             adicionarMensagemSistema(data.texto);
         } else {
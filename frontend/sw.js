@@ -1,5 +1,6 @@
 // Service Worker para PWA
-const CACHE_NAME = 'chat-app-v1';
+const CACHE_NAME = 'chat-app-v2';
+const DATA_CACHE_NAME = 'chat-app-dados';
 const urlsToCache = [
   '/',
   '/index.html',
@@ -25,7 +26,7 @@ self.addEventListener('activate', (event) => {
     caches.keys().then((cacheNames) => {
       return Promise.all(
         cacheNames.map((cacheName) => {
-          if (cacheName !== CACHE_NAME) {
+          if (cacheName !== CACHE_NAME && cacheName !== DATA_CACHE_NAME) {
             console.log('Removendo cache antigo:', cacheName);
             return caches.delete(cacheName);
           }
@@ -35,8 +36,64 @@ self.addEventListener('activate', (event) => {
   );
 });
 
+// Sincroniza a cópia local de /motoristas pedindo só o que mudou
+async function sincronizarMotoristas(request) {
+  const cache = await caches.open(DATA_CACHE_NAME);
+  const cached = await cache.match(request.url);
+  const local = cached ? await cached.json() : null;
+
+  const url = new URL(request.url);
+  if (local) {
+    // O servidor responde 304 se nada mudou desde esta versão
+    url.searchParams.set('since', local.versao);
+  }
+
+  let response;
+  try {
+    response = await fetch(url.toString());
+  } catch (err) {
+    // Offline: usa a cópia local, se houver
+    if (local) return jsonResponse(local);
+    throw err;
+  }
+
+  if (response.status === 304 && local) return jsonResponse(local);
+  if (!response.ok) return local ? jsonResponse(local) : response;
+
+  const delta = await response.json();
+  let dados = delta;
+  if (local && !delta.completo) {
+    const porLh = new Map(local.motoristas.map((m) => [m.LH, m]));
+    delta.removidos.forEach((lh) => porLh.delete(lh));
+    delta.motoristas.forEach((m) => porLh.set(m.LH, m));
+    dados = {
+      versao: delta.versao,
+      completo: true,
+      motoristas: Array.from(porLh.values()),
+      removidos: []
+    };
+  }
+
+  await cache.put(request.url, jsonResponse(dados));
+  return jsonResponse(dados);
+}
+
+function jsonResponse(dados) {
+  return new Response(JSON.stringify(dados), {
+    headers: { 'Content-Type': 'application/json' }
+  });
+}
+
 // Fetch
 self.addEventListener('fetch', (event) => {
+  const url = new URL(event.request.url);
+  if (event.request.method === 'GET' &&
+      url.pathname.endsWith('/motoristas') &&
+      !url.searchParams.has('since')) {
+    event.respondWith(sincronizarMotoristas(event.request));
+    return;
+  }
+
   event.respondWith(
     caches.match(event.request)
       .then((response) => {
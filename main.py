@@ -2,14 +2,16 @@
 Backend FastAPI com WebSocket para chat em tempo real.
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
-from typing import Dict, Set
+from collections import deque
+from typing import Deque, Dict, Optional, Set
 import json
 import logging
 import os
+import time
 from pathlib import Path
 
 from chat_handler import ChatHandler
@@ -27,6 +29,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # Gerenciador de chat
@@ -41,6 +44,7 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "websocket": "/ws/{user_id}",
+            "motoristas": "/motoristas",
             "health": "/health"
         }
     }
@@ -65,25 +69,146 @@ async def test_post(payload: dict):
     resposta = chat_handler.processar_mensagem(user_id, mensagem)
     return resposta
 
+# Lista estruturada de motoristas para o cache offline do PWA
+@app.get("/motoristas")
+async def listar_motoristas(request: Request, response: Response, since: Optional[str] = None):
+    """
+    Retorna os motoristas com ETag baseado na versão dos dados.
+    
+    Com ?since=<versao> (o campo "versao" de uma resposta anterior) retorna só
+    os registros alterados depois dela. O ETag identifica a representação:
+    '"<versao>"' para a lista completa e '"<versao>+<since>"' para o delta.
+    Um since de outra base (ou inválido) devolve a lista completa.
+    Responde 304 se o since já é a versão atual ou se o If-None-Match do
+    cliente ainda corresponde ao ETag.
+    """
+    bot = chat_handler.bot
+    token = bot.token_versao()
+    desde = bot.versao_do_token(since)
+    etag = f'"{token}"' if desde is None else f'"{token}+{bot.epoca}.{desde}"'
+    if_none_match = [t.strip().replace("W/", "", 1) for t in request.headers.get("if-none-match", "").split(",")]
+    # since igual à versão atual: o cliente já está em dia
+    if since == token or "*" in if_none_match or etag in if_none_match:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return bot.exportar_motoristas(since)
+
+# Quantidade de mensagens guardadas por usuário para reenvio após reconexão
+TAMANHO_BUFFER_REENVIO = int(os.environ.get("TAMANHO_BUFFER_REENVIO", 100))
+# Segundos que o buffer de um usuário desconectado é mantido
+BUFFER_TTL_SEGUNDOS = int(os.environ.get("BUFFER_TTL_SEGUNDOS", 300))
+# Máximo de usuários com buffer de reenvio em memória
+MAX_USUARIOS_BUFFER = int(os.environ.get("MAX_USUARIOS_BUFFER", 1000))
+
 # Armazena conexões WebSocket ativas
 class ConnectionManager:
-    def __init__(self):
+    def __init__(
+        self,
+        tamanho_buffer: int = TAMANHO_BUFFER_REENVIO,
+        ttl_buffer: float = BUFFER_TTL_SEGUNDOS,
+        max_usuarios: int = MAX_USUARIOS_BUFFER,
+    ):
         self.active_connections: Dict[str, WebSocket] = {}
+        # Número de sequência da última mensagem enviada para cada usuário
+        self.sequencias: Dict[str, int] = {}
+        # Últimas mensagens enviadas por usuário (limitado a tamanho_buffer)
+        self.buffers: Dict[str, Deque[dict]] = {}
+        # Momento (time.monotonic) da última atividade de cada usuário com buffer
+        self.ultima_atividade: Dict[str, float] = {}
+        self.tamanho_buffer = tamanho_buffer
+        self.ttl_buffer = ttl_buffer
+        self.max_usuarios = max_usuarios
     
     async def connect(self, websocket: WebSocket, user_id: str):
         await websocket.accept()
         self.active_connections[user_id] = websocket
+        self.ultima_atividade[user_id] = time.monotonic()
+        self._expirar_buffers()
         logger.info(f"✅ Usuário {user_id} conectado. Total: {len(self.active_connections)}")
     
-    def disconnect(self, user_id: str):
+    def disconnect(self, user_id: str, websocket: Optional[WebSocket] = None):
+        # Ignora se o usuário já reconectou com outro socket
+        if websocket is not None and self.active_connections.get(user_id) is not websocket:
+            return
         if user_id in self.active_connections:
             del self.active_connections[user_id]
+            self.ultima_atividade[user_id] = time.monotonic()
+            self._expirar_buffers()
             logger.info(f"❌ Usuário {user_id} desconectado. Total: {len(self.active_connections)}")
     
     async def send_message(self, user_id: str, message: dict):
+        """Envia mensagem numerada e guarda no buffer de reenvio do usuário."""
+        seq = self.sequencias.get(user_id, 0) + 1
+        self.sequencias[user_id] = seq
+        message = {**message, "seq": seq}
+        if user_id not in self.buffers:
+            self.buffers[user_id] = deque(maxlen=self.tamanho_buffer)
+        self.buffers[user_id].append(message)
+        self.ultima_atividade[user_id] = time.monotonic()
+
         if user_id in self.active_connections:
             await self.active_connections[user_id].send_json(message)
     
+    def _descartar(self, user_id: str):
+        self.buffers.pop(user_id, None)
+        self.sequencias.pop(user_id, None)
+        self.ultima_atividade.pop(user_id, None)
+    
+    def _expirar_buffers(self):
+        """
+        Descarta buffers de usuários desconectados há mais de ttl_buffer e,
+        acima de max_usuarios, os desconectados mais antigos.
+        
+        Roda só no connect/disconnect (fora do envio de respostas). Usuários
+        conectados nunca são descartados, mesmo que o limite seja ultrapassado,
+        para não reiniciar a numeração deles.
+        """
+        agora = time.monotonic()
+        desconectados = [u for u in self.ultima_atividade if u not in self.active_connections]
+        for user_id in desconectados:
+            if agora - self.ultima_atividade[user_id] > self.ttl_buffer:
+                self._descartar(user_id)
+        
+        excesso = len(self.ultima_atividade) - self.max_usuarios
+        if excesso > 0:
+            restantes = [u for u in desconectados if u in self.ultima_atividade]
+            restantes.sort(key=lambda u: self.ultima_atividade[u])
+            for user_id in restantes[:excesso]:
+                self._descartar(user_id)
+    
+    async def resend_missed(self, user_id: str, last_seq: int) -> int:
+        """
+        Reenvia as mensagens com seq maior que last_seq ainda presentes no buffer.
+        
+        Se parte delas já saiu do buffer, ou o servidor não tem mais o estado
+        do usuário (buffer expirado, servidor reiniciado), envia antes um aviso
+        de sistema (com "lacuna": true) para o cliente atualizar os dados.
+        
+        Returns:
+            Quantidade de mensagens reenviadas
+        """
+        sem_estado = user_id not in self.sequencias
+        # Servidor perdeu a numeração: continua a partir do cliente
+        if last_seq > self.sequencias.get(user_id, 0):
+            self.sequencias[user_id] = last_seq
+        websocket = self.active_connections.get(user_id)
+        if websocket is None:
+            return 0
+        buffer = self.buffers.get(user_id, ())
+        if (sem_estado and last_seq > 0) or (buffer and last_seq + 1 < buffer[0]["seq"]):
+            await websocket.send_json({
+                "tipo": "sistema",
+                "texto": "⚠️ Algumas mensagens se perderam durante a desconexão. Envie /listar para atualizar.",
+                "lacuna": True,
+                "timestamp": ""
+            })
+        perdidas = [m for m in buffer if m["seq"] > last_seq]
+        for message in perdidas:
+            await websocket.send_json(message)
+        return len(perdidas)
+    
     async def broadcast(self, message: dict):
         for connection in self.active_connections.values():
             await connection.send_json(message)
@@ -119,12 +244,18 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
     await manager.connect(websocket, user_id)
     
     try:
-        # Mensagem de boas-vindas
-        await manager.send_message(user_id, {
-            "tipo": "sistema",
-            "texto": "🟢 Conectado ao servidor!",
-            "timestamp": ""
-        })
+        # Cliente reconectando informa a última sequência recebida
+        last_seq = websocket.query_params.get("last_seq")
+        if last_seq is not None and last_seq.isdigit():
+            reenviadas = await manager.resend_missed(user_id, int(last_seq))
+            logger.info(f"🔁 {reenviadas} mensagens reenviadas para {user_id}")
+        else:
+            # Mensagem de boas-vindas (não numerada, não entra no buffer)
+            await websocket.send_json({
+                "tipo": "sistema",
+                "texto": "🟢 Conectado ao servidor!",
+                "timestamp": ""
+            })
         
         while True:
             # Recebe mensagem do cliente
@@ -148,12 +279,12 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
             logger.info(f"📤 Resposta enviada para {user_id}")
     
     except WebSocketDisconnect:
-        manager.disconnect(user_id)
+        manager.disconnect(user_id, websocket)
         logger.info(f"🔴 WebSocket desconectado: {user_id}")
     
     except Exception as e:
         logger.error(f"❌ Erro no WebSocket: {e}", exc_info=True)
-        manager.disconnect(user_id)
+        manager.disconnect(user_id, websocket)
 
 
 # Configuração para Railway - detecta porta automaticamente
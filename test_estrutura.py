@@ -0,0 +1,217 @@
+"""
+Testes da base de motoristas (estrutura.py).
+"""
+
+import json
+
+import pytest
+
+from estrutura import Motorista, RoboBolsao
+
+ARQUIVO_ANTIGO = {
+    "motoristas": {
+        "LT0PC301T7Q32": {"LH": "LT0PC301T7Q32", "Placas": "DBM3B23,GDJ6993", "Nome": "Agnaldo Simoes"},
+        "LT0PC301SZNA2": {"LH": "LT0PC301SZNA2", "Placas": "GILBERT", "Nome": "Paulo"},
+    },
+    "historico": {}
+}
+
+
+def criar_robo(tmp_path, dados=None):
+    arquivo = tmp_path / "motoristas.json"
+    if dados is not None:
+        arquivo.write_text(json.dumps(dados), encoding="utf-8")
+    return RoboBolsao(str(arquivo))
+
+
+def lhs(resultado):
+    return sorted(m["LH"] for m in resultado["motoristas"])
+
+
+def test_exportar_sem_desde_retorna_tudo(tmp_path):
+    robo = criar_robo(tmp_path, ARQUIVO_ANTIGO)
+    resultado = robo.exportar_motoristas()
+    assert resultado["completo"] is True
+    assert lhs(resultado) == ["LT0PC301SZNA2", "LT0PC301T7Q32"]
+
+
+def test_arquivo_antigo_com_desde_zero_retorna_tudo(tmp_path):
+    robo = criar_robo(tmp_path, ARQUIVO_ANTIGO)
+    for desde in [f"{robo.epoca}.0", f"{robo.epoca}.-1", "0", "-1"]:
+        resultado = robo.exportar_motoristas(desde)
+        assert resultado["completo"] is True, desde
+        assert len(resultado["motoristas"]) == 2, desde
+
+
+def test_delta_traz_alterados_e_removidos(tmp_path):
+    robo = criar_robo(tmp_path, ARQUIVO_ANTIGO)
+    robo.adicionar_motoristas("LT0PC301XXXX1 Fulano ABC1234")
+    token = robo.token_versao()
+
+    robo.marcar_concluido("LT0PC301XXXX1")
+    robo.remover_motorista("LT0PC301SZNA2")
+    delta = robo.exportar_motoristas(token)
+
+    assert delta["completo"] is False
+    assert [(m["LH"], m["status"]) for m in delta["motoristas"]] == [("LT0PC301XXXX1", "concluido")]
+    assert delta["removidos"] == ["LT0PC301SZNA2"]
+    assert delta["versao"] == robo.token_versao()
+
+
+def test_delta_sem_alteracoes_vem_vazio(tmp_path):
+    robo = criar_robo(tmp_path, ARQUIVO_ANTIGO)
+    robo.adicionar_motoristas("LT0PC301XXXX1 Fulano ABC1234")
+    delta = robo.exportar_motoristas(robo.token_versao())
+    assert delta["completo"] is False
+    assert delta["motoristas"] == [] and delta["removidos"] == []
+
+
+def test_epoca_e_versao_persistem(tmp_path):
+    robo = criar_robo(tmp_path)
+    robo.adicionar_motoristas("LT0PC301XXXX1 Fulano ABC1234")
+    recarregado = RoboBolsao(robo.arquivo_dados)
+    assert recarregado.token_versao() == robo.token_versao()
+
+
+def test_base_recriada_nao_aceita_token_antigo(tmp_path):
+    robo = criar_robo(tmp_path)
+    robo.adicionar_motoristas("LT0PC301XXXX1 Fulano ABC1234")
+    robo.adicionar_motoristas("LT0PC301XXXX2 Ciclano DEF5678")
+    token_antigo = f"{robo.epoca}.1"
+
+    (tmp_path / "motoristas.json").unlink()
+    nova = RoboBolsao(robo.arquivo_dados)
+    nova.adicionar_motoristas("LT0PC301XXXX3 Beltrano GHI9012")
+    nova.adicionar_motoristas("LT0PC301XXXX4 Outro JKL3456")
+
+    assert nova.epoca != robo.epoca
+    resultado = nova.exportar_motoristas(token_antigo)
+    assert resultado["completo"] is True
+    assert lhs(resultado) == ["LT0PC301XXXX3", "LT0PC301XXXX4"]
+
+
+def test_alteracoes_sao_compactadas(tmp_path, monkeypatch):
+    monkeypatch.setattr("estrutura.LIMITE_ALTERACOES", 4)
+    robo = criar_robo(tmp_path)
+    robo.adicionar_motoristas("LT0PC301XXXX1 Fulano ABC1234")
+    token_antigo = robo.token_versao()
+    for i in range(2, 7):
+        robo.adicionar_motoristas(f"LT0PC301XXXX{i} Motorista ABC123{i}")
+
+    assert len(robo.alteracoes) <= 4
+    assert robo.versao_minima > 1
+    assert "LT0PC301XXXX1" not in robo.alteracoes
+
+    # Token anterior ao piso volta a lista completa
+    assert robo.exportar_motoristas(token_antigo)["completo"] is True
+
+    # Token recente ainda recebe só o delta, inclusive após recarregar
+    recente = robo.token_versao()
+    robo.remover_motorista("LT0PC301XXXX6")
+    recarregado = RoboBolsao(robo.arquivo_dados)
+    assert recarregado.versao_minima == robo.versao_minima
+    delta = recarregado.exportar_motoristas(recente)
+    assert delta["completo"] is False
+    assert delta["removidos"] == ["LT0PC301XXXX6"]
+
+
+def test_exportar_ignora_entradas_que_nao_sao_motorista(tmp_path):
+    dados = {"motoristas": dict(ARQUIVO_ANTIGO["motoristas"], LT0PC301LIXO1="lixo"), "historico": {}}
+    robo = criar_robo(tmp_path, dados)
+    assert lhs(robo.exportar_motoristas()) == ["LT0PC301SZNA2", "LT0PC301T7Q32"]
+
+
+# ===== Registros compactos =====
+
+def test_round_trip_mantem_formato_do_arquivo(tmp_path):
+    robo = criar_robo(tmp_path, ARQUIVO_ANTIGO)
+    robo.marcar_cancelado("LT0PC301SZNA2")
+    salvo = json.loads((tmp_path / "motoristas.json").read_text(encoding="utf-8"))
+
+    assert salvo["motoristas"] == ARQUIVO_ANTIGO["motoristas"]
+    historico = salvo["historico"]["LT0PC301SZNA2"]
+    assert historico["motorista"] == ARQUIVO_ANTIGO["motoristas"]["LT0PC301SZNA2"]
+    assert historico["status"] == "cancelado"
+
+
+def test_historico_reaproveita_motorista_ativo_igual(tmp_path):
+    robo = criar_robo(tmp_path, ARQUIVO_ANTIGO)
+    robo.marcar_concluido("LT0PC301SZNA2")
+    recarregado = RoboBolsao(robo.arquivo_dados)
+
+    ativo = recarregado.dados_motoristas["LT0PC301SZNA2"]
+    assert recarregado.historico_status["LT0PC301SZNA2"].motorista is ativo
+
+
+def test_historico_de_outro_motorista_com_mesmo_lh_e_preservado(tmp_path):
+    robo = criar_robo(tmp_path)
+    robo.adicionar_motoristas("LT0PC301XXXX1 Joao Silva ABC1234")
+    robo.remover_motorista("LT0PC301XXXX1")
+    robo.adicionar_motoristas("LT0PC301XXXX1 Maria Souza XYZ9876")
+
+    recarregado = RoboBolsao(robo.arquivo_dados)
+    historico = recarregado.historico_status["LT0PC301XXXX1"]
+    assert historico.motorista["Nome"] == "Joao Silva"
+    assert historico.motorista is not recarregado.dados_motoristas["LT0PC301XXXX1"]
+
+    recarregado.adicionar_motoristas("LT0PC301XXXX2 Outro DEF5678")
+    relatorio = RoboBolsao(robo.arquivo_dados).obter_relatorio_fechamento()
+    cancelado = [r for r in relatorio if r["Status"] == "Cancelado"]
+    assert [(r["Nome"], r["Placa"]) for r in cancelado] == [("Joao Silva", "ABC1234")]
+
+
+def test_campos_nulos_nao_apagam_a_base(tmp_path):
+    dados = {
+        "motoristas": {
+            "LT0PC301XXXX1": {"LH": "LT0PC301XXXX1", "Placas": None, "Nome": "Fulano"},
+            "LT0PC301XXXX2": {"LH": "LT0PC301XXXX2", "Placas": "ABC1234", "Nome": "Ciclano"},
+        },
+        "historico": {
+            "LT0PC301XXXX1": {"motorista": None, "status": "cancelado", "data": None, "motivo": "cancelado"}
+        }
+    }
+    robo = criar_robo(tmp_path, dados)
+    assert len(robo.dados_motoristas) == 2
+    assert robo.dados_motoristas["LT0PC301XXXX1"]["Placas"] is None
+    assert robo.historico_status["LT0PC301XXXX1"]["data"] is None
+
+    robo.adicionar_motoristas("LT0PC301XXXX3 Beltrano DEF5678")
+    assert len(RoboBolsao(robo.arquivo_dados).dados_motoristas) == 3
+
+
+def test_motorista_compativel_com_dict():
+    motorista = Motorista("LT0PC301XXXX1", "ABC1234", "Fulano")
+    assert motorista["Nome"] == "Fulano"
+    assert motorista.get("status", "Ativo") == "Ativo"
+    assert "Placas" in motorista
+    assert dict(motorista.items()) == motorista.to_dict()
+
+
+def test_motorista_dict_completo_e_nao_hasheavel():
+    motorista = Motorista("LT0PC301XXXX1", "ABC1234", "Fulano", {"status": "ativo"})
+    assert list(motorista) == ["LH", "Placas", "Nome", "status"]
+    assert len(motorista) == 4
+    assert motorista["status"] == "ativo"
+    with pytest.raises(TypeError):
+        hash(motorista)
+
+
+def test_chaves_extras_sobrevivem_ao_salvar(tmp_path):
+    dados = {
+        "motoristas": {
+            "LT0PC301XXXX1": {"LH": "LT0PC301XXXX1", "Placas": "ABC1234", "Nome": "Fulano", "status": "ativo"},
+        },
+        "historico": {
+            "LT0PC301XXXX9": {
+                "motorista": {"LH": "LT0PC301XXXX9", "Placas": "DEF5678", "Nome": "Ciclano", "obs": "x"},
+                "status": "cancelado", "data": "01/01/2026 10:00", "motivo": "cancelado", "origem": "bot"
+            }
+        }
+    }
+    robo = criar_robo(tmp_path, dados)
+    assert robo.dados_motoristas["LT0PC301XXXX1"].get("status") == "ativo"
+
+    robo.adicionar_motoristas("LT0PC301XXXX2 Beltrano GHI9012")
+    salvo = json.loads((tmp_path / "motoristas.json").read_text(encoding="utf-8"))
+    assert salvo["motoristas"]["LT0PC301XXXX1"] == dados["motoristas"]["LT0PC301XXXX1"]
+    assert salvo["historico"] == dados["historico"]
@@ -0,0 +1,249 @@
+"""
+Testes do backend (main.py).
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from main import ConnectionManager
+
+
+class FakeWebSocket:
+    """WebSocket mínimo: só registra o que foi enviado."""
+
+    def __init__(self):
+        self.enviadas = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        self.enviadas.append(message)
+
+
+def rodar(coro):
+    return asyncio.run(coro)
+
+
+def test_mensagens_numeradas_por_usuario():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    rodar(manager.connect(ws, "a"))
+    rodar(manager.send_message("a", {"texto": "1"}))
+    rodar(manager.send_message("a", {"texto": "2"}))
+    rodar(manager.send_message("b", {"texto": "x"}))
+
+    assert [m["seq"] for m in ws.enviadas] == [1, 2]
+    assert manager.sequencias["b"] == 1
+
+
+def test_reconexao_reenvia_so_o_que_foi_perdido():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    rodar(manager.connect(ws, "a"))
+    rodar(manager.send_message("a", {"texto": "1"}))
+    manager.disconnect("a", ws)
+    rodar(manager.send_message("a", {"texto": "2"}))
+    rodar(manager.send_message("a", {"texto": "3"}))
+
+    novo = FakeWebSocket()
+    rodar(manager.connect(novo, "a"))
+    assert rodar(manager.resend_missed("a", 1)) == 2
+    assert [m["texto"] for m in novo.enviadas] == ["2", "3"]
+
+
+def test_disconnect_de_socket_antigo_nao_derruba_o_novo():
+    manager = ConnectionManager()
+    antigo, novo = FakeWebSocket(), FakeWebSocket()
+    rodar(manager.connect(antigo, "a"))
+    rodar(manager.connect(novo, "a"))
+    manager.disconnect("a", antigo)
+
+    assert manager.active_connections["a"] is novo
+
+
+def test_reenvio_avisa_quando_buffer_nao_cobre_a_lacuna():
+    manager = ConnectionManager(tamanho_buffer=2)
+    for i in range(5):
+        rodar(manager.send_message("a", {"texto": str(i)}))
+
+    ws = FakeWebSocket()
+    rodar(manager.connect(ws, "a"))
+    assert rodar(manager.resend_missed("a", 1)) == 2
+
+    aviso = ws.enviadas[0]
+    assert aviso["tipo"] == "sistema" and aviso["lacuna"] is True
+    assert "seq" not in aviso
+    assert [m["seq"] for m in ws.enviadas[1:]] == [4, 5]
+
+
+def test_sem_aviso_quando_nada_se_perdeu():
+    manager = ConnectionManager(tamanho_buffer=2)
+    for i in range(5):
+        rodar(manager.send_message("a", {"texto": str(i)}))
+
+    ws = FakeWebSocket()
+    rodar(manager.connect(ws, "a"))
+    rodar(manager.resend_missed("a", 3))
+    assert [m.get("seq") for m in ws.enviadas] == [4, 5]
+
+
+def test_servidor_reiniciado_continua_numeracao_do_cliente():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    rodar(manager.connect(ws, "a"))
+    assert rodar(manager.resend_missed("a", 7)) == 0
+    assert ws.enviadas[-1]["lacuna"] is True
+    rodar(manager.send_message("a", {"texto": "x"}))
+    assert ws.enviadas[-1]["seq"] == 8
+
+
+def test_primeira_conexao_sem_aviso():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    rodar(manager.connect(ws, "a"))
+    rodar(manager.resend_missed("a", 0))
+    assert ws.enviadas == []
+
+
+def test_buffer_de_desconectado_expira(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr("main.time.monotonic", lambda: agora[0])
+    manager = ConnectionManager(ttl_buffer=60)
+    ws = FakeWebSocket()
+    rodar(manager.connect(ws, "a"))
+    rodar(manager.send_message("a", {"texto": "1"}))
+    manager.disconnect("a", ws)
+
+    agora[0] += 61
+    rodar(manager.connect(FakeWebSocket(), "b"))
+    assert "a" not in manager.buffers
+    assert "a" not in manager.sequencias
+
+    # Ao voltar, o cliente é avisado de que pode ter perdido respostas
+    novo = FakeWebSocket()
+    rodar(manager.connect(novo, "a"))
+    rodar(manager.resend_missed("a", 1))
+    assert novo.enviadas[0]["lacuna"] is True
+
+
+def test_buffer_de_conectado_nao_expira(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr("main.time.monotonic", lambda: agora[0])
+    manager = ConnectionManager(ttl_buffer=60)
+    rodar(manager.connect(FakeWebSocket(), "a"))
+    rodar(manager.send_message("a", {"texto": "1"}))
+
+    agora[0] += 61
+    rodar(manager.connect(FakeWebSocket(), "b"))
+    assert "a" in manager.buffers
+
+
+def test_limite_de_usuarios_descarta_desconectado_mais_antigo(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr("main.time.monotonic", lambda: agora[0])
+    manager = ConnectionManager(max_usuarios=2)
+    rodar(manager.connect(FakeWebSocket(), "conectado"))
+    for user_id in ["velho", "novo", "extra"]:
+        agora[0] += 1
+        ws = FakeWebSocket()
+        rodar(manager.connect(ws, user_id))
+        rodar(manager.send_message(user_id, {"texto": "x"}))
+        manager.disconnect(user_id, ws)
+
+    assert set(manager.ultima_atividade) == {"conectado", "extra"}
+    assert set(manager.buffers) == {"extra"}
+
+
+def test_limite_nunca_descarta_usuario_conectado():
+    manager = ConnectionManager(max_usuarios=2)
+    sockets = {u: FakeWebSocket() for u in ["a", "b", "c"]}
+    for user_id, ws in sockets.items():
+        rodar(manager.connect(ws, user_id))
+    for _ in range(2):
+        for user_id in sockets:
+            rodar(manager.send_message(user_id, {"texto": "x"}))
+
+    assert set(manager.sequencias) == {"a", "b", "c"}
+    for ws in sockets.values():
+        assert [m["seq"] for m in ws.enviadas] == [1, 2]
+
+
+# ===== GET /motoristas =====
+
+@pytest.fixture
+def cliente(tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    import main
+    from estrutura import RoboBolsao
+
+    bot = RoboBolsao(str(tmp_path / "motoristas.json"))
+    bot.adicionar_motoristas("LT0PC301XXXX1 Fulano ABC1234")
+    monkeypatch.setattr(main.chat_handler, "bot", bot)
+    return TestClient(main.app), bot
+
+
+def test_motoristas_retorna_etag_e_304(cliente):
+    client, bot = cliente
+    resposta = client.get("/motoristas")
+    assert resposta.status_code == 200
+    etag = resposta.headers["etag"]
+    assert etag == f'"{bot.token_versao()}"'
+
+    assert client.get("/motoristas", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/motoristas", headers={"If-None-Match": "*"}).status_code == 304
+
+    bot.adicionar_motoristas("LT0PC301XXXX2 Ciclano DEF5678")
+    assert client.get("/motoristas", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_delta_tem_etag_proprio(cliente):
+    client, bot = cliente
+    completo = client.get("/motoristas")
+    versao = completo.json()["versao"]
+
+    bot.adicionar_motoristas("LT0PC301XXXX2 Ciclano DEF5678")
+    delta = client.get("/motoristas", params={"since": versao})
+    assert delta.status_code == 200
+    assert [m["LH"] for m in delta.json()["motoristas"]] == ["LT0PC301XXXX2"]
+    assert delta.headers["etag"] != f'"{bot.token_versao()}"'
+
+    # Replay do ETag recebido no delta, enquanto nada mudou
+    etag_delta = delta.headers["etag"]
+    resposta = client.get("/motoristas", params={"since": versao}, headers={"If-None-Match": etag_delta})
+    assert resposta.status_code == 304
+
+
+def test_since_da_versao_atual_responde_304(cliente, tmp_path, monkeypatch):
+    client, bot = cliente
+    atual = client.get("/motoristas").json()["versao"]
+    assert client.get("/motoristas", params={"since": atual}).status_code == 304
+
+    # Também numa base na versão 0 (arquivo antigo ou vazio)
+    import main
+    from estrutura import RoboBolsao
+
+    vazia = RoboBolsao(str(tmp_path / "vazia.json"))
+    monkeypatch.setattr(main.chat_handler, "bot", vazia)
+    versao_zero = client.get("/motoristas").json()["versao"]
+    assert client.get("/motoristas", params={"since": versao_zero}).status_code == 304
+
+
+def test_entrada_que_nao_e_motorista_nao_derruba_endpoint(cliente):
+    client, bot = cliente
+    bot.dados_motoristas["LT0PC301LIXO1"] = "lixo"
+    resposta = client.get("/motoristas")
+    assert resposta.status_code == 200
+    assert [m["LH"] for m in resposta.json()["motoristas"]] == ["LT0PC301XXXX1"]
+
+
+def test_since_de_outra_base_retorna_lista_completa(cliente):
+    client, bot = cliente
+    resposta = client.get("/motoristas", params={"since": "outraepoca.1"})
+    assert resposta.json()["completo"] is True
+    assert resposta.headers["etag"] == f'"{bot.token_versao()}"'